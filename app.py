@@ -19,33 +19,84 @@ UI는 좌/우 2분할:
 Quickstart
 ----------
 1) Python 3.10+ 권장
-2) pip install -r requirements.txt  (필요 패키지: Flask, pypdf, markdown, openai, python-dotenv)
+2) pip install -r requirements.txt  (필요 패키지: Flask, pypdf, pypdfium2, mistune, openai, httpx, tiktoken, orjson, python-dotenv)
 3) 환경변수 설정:  set OPENAI_API_KEY=...  (Windows)  /  export OPENAI_API_KEY=...  (macOS/Linux)
+   (선택) PDF_BACKEND=pypdfium2|pymupdf|pypdf 로 텍스트 추출 엔진 선택 (pymupdf 는 별도 설치)
+   (선택) pip install brotli → 문제 JSON 의 .br 압축본도 함께 저장 (.gz 는 항상 저장)
 4) python app.py 실행 → 브라우저에서 http://127.0.0.1:5000
+5) (개발) pip install pytest && python -m pytest -q  → tests/ 단위 테스트
 
 파일 구조는 자동 생성됩니다:
   .
   ├─ app.py (이 파일)
+  ├─ pdf_filter.py (pypdf 용 콘텐츠 스트림 그래픽 연산자 필터)
+  ├─ tests/ (pytest 단위 테스트)
   ├─ data/
-  │   ├─ problems/  (생성된 문제 JSON들)
-  │   └─ summaries/ (생성된 요약 .md들)
+  │   ├─ problems/  (생성된 문제 JSON들 + 미리 압축한 .json.gz/.json.br)
+  │   ├─ summaries/ (생성된 요약 .md들 + 렌더링된 .html)
+  │   ├─ index.jsonl (저장 목록; 파일을 직접 추가했다면 POST /api/rebuild-index)
+  │   ├─ cache_index.json (같은 PDF 재업로드 시 OpenAI 호출 생략용 캐시)
+  │   └─ batches.sqlite3 ("저렴하게 생성" 배치 작업 상태)
 
 메모: OpenAI 요금이 발생하므로, 긴 PDF는 비용이 큼. 필요 시 페이지 제한, 발췌 등으로 줄이세요.
 """
 
+import gzip
 import os
 import re
 import json
+import queue
+import sqlite3
+import atexit
+import hashlib
+import signal
+import asyncio
+import tempfile
+import functools
+import contextlib
+import threading
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
-
-from flask import Flask, request, jsonify, Response, render_template_string, send_from_directory, url_for, redirect
+from typing import List, Dict, Any, Awaitable, Callable, Iterable, Iterator, NamedTuple, Optional, Set, Tuple, TypeVar
+
+from flask.json.provider import DefaultJSONProvider
+from flask import Flask, Request, request, jsonify, Response, abort, render_template_string, send_from_directory, stream_with_context, url_for, redirect
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.security import safe_join
+import orjson
+import tiktoken
 from pypdf import PdfReader
-from markdown import markdown
+from pypdf.generic import DecodedStreamObject, NameObject
+from pdf_filter import filter_text_operators
+
+try:
+    import fcntl  # POSIX only; used to lock the listing index across processes
+except ImportError:
+    fcntl = None
+try:
+    import brotli  # optional; without it only the .json.gz copy is written
+except ImportError:
+    brotli = None
+
+# Optional C-backed PDF text extractors (see PDF_BACKEND)
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+import mistune
 
 # OpenAI SDK (>=1.40.0)
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 # ---------------------------
 # Config
@@ -56,52 +107,583 @@ PROBLEMS_DIR = DATA_DIR / "problems"
 SUMMARIES_DIR = DATA_DIR / "summaries"
 for p in [DATA_DIR, PROBLEMS_DIR, SUMMARIES_DIR]:
     p.mkdir(parents=True, exist_ok=True)
+# {"<sha256 of uploaded PDF>:<model>": {"problems": file name, "summary": file name}}
+CACHE_INDEX_PATH = DATA_DIR / "cache_index.json"
+
+# Append-only listing of saved results; the list pages read its tail instead of globbing
+INDEX_PATH = DATA_DIR / "index.jsonl"
+LIST_LIMIT = 200
+
+# Batch-mode jobs: {(content digest, model): OpenAI batch id + status}
+BATCH_DB_PATH = DATA_DIR / "batches.sqlite3"
+BATCH_POLL_INTERVAL_S = float(os.environ.get("BATCH_POLL_INTERVAL_S", "60"))
+# A batch left "collecting" this long was abandoned by its process (e.g. restart) and is picked up again
+BATCH_COLLECT_STALE_S = float(os.environ.get("BATCH_COLLECT_STALE_S", "600"))
+
+# Uploads larger than this are rejected with 413 before they are read
+MAX_UPLOAD_MB = int(os.environ.get("MAX_UPLOAD_MB", "50"))
+
+# Saved results never change once written, so browsers may keep them for a year
+RESULT_MAX_AGE_S = 31536000
 
 MODEL_DEFAULT = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 if not OPENAI_API_KEY:
     print("[WARN] OPENAI_API_KEY 가 설정되지 않았습니다. 생성 기능은 동작하지 않습니다.")
 
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# Upper bound on simultaneous HTTP connections to the OpenAI API (shared by all requests)
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "100"))
+# Output budget for a summary call (problem sets are budgeted per question below)
+MAX_OUTPUT_TOKENS_PER_CALL = 2500
+# Output budget per generated question (JSON only, thanks to structured outputs)
+PROBLEM_MAX_OUTPUT_TOKENS_PER_ITEM = 250
+# Output budget for the per-chunk notes that get merged into the final summary
+CHUNK_SUMMARY_MAX_OUTPUT_TOKENS = 1200
+# Max in-flight OpenAI calls on the shared loop (long PDFs fan out into many chunk calls)
+OPENAI_MAX_CONCURRENCY = int(os.environ.get("OPENAI_MAX_CONCURRENCY", "16"))
+
+# Context window of OPENAI_MODEL in tokens (input + output)
+MODEL_CONTEXT = int(os.environ.get("OPENAI_MODEL_CONTEXT", "128000"))
+# Long PDFs are split into chunks of at most this many tokens and summarized map-reduce style
+CHUNK_MAX_TOKENS = min(
+    int(os.environ.get("CHUNK_MAX_TOKENS", "3000")),
+    MODEL_CONTEXT - MAX_OUTPUT_TOKENS_PER_CALL - 512,
+)
+PROBLEMS_PER_LEVEL = 15
+
+# Soft per-page budget for PDF text extraction; slower pages are skipped
+PDF_PAGE_TIMEOUT_S = float(os.environ.get("PDF_PAGE_TIMEOUT_S", "10"))
+# Parent-side backstop for workers without SIGALRM, counted from when the pool marks a page running.
+# A "running" page may still sit in the pool's call queue behind up to two page budgets.
+PDF_PAGE_BACKSTOP_S = PDF_PAGE_TIMEOUT_S * 3
+# Pages whose content stream exceeds this many bytes are treated as diagrams and skipped (pypdf backend)
+PDF_PAGE_MAX_CONTENT_BYTES = int(os.environ.get("PDF_PAGE_MAX_CONTENT_BYTES", "2000000"))
+EXTRACTOR = ProcessPoolExecutor(max_workers=os.cpu_count())
+_EXTRACTOR_LOCK = threading.Lock()
+
+# Text extraction backend: pypdfium2 (PDFium, default) | pymupdf (MuPDF) | pypdf (pure Python)
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pypdfium2").lower()
+if PDF_BACKEND not in ("pypdfium2", "pymupdf", "pypdf"):
+    print(f"[WARN] 알 수 없는 PDF_BACKEND={PDF_BACKEND!r} 입니다. pypdf 로 대체합니다.")
+    PDF_BACKEND = "pypdf"
+elif (PDF_BACKEND == "pypdfium2" and pdfium is None) or (PDF_BACKEND == "pymupdf" and pymupdf is None):
+    print(f"[WARN] PDF_BACKEND={PDF_BACKEND} 패키지가 설치되지 않았습니다. pypdf 로 대체합니다.")
+    PDF_BACKEND = "pypdf"
+
+
+# ---------------------------
+# Async runtime
+# ---------------------------
+# Generation time is almost entirely spent waiting on the network, so every request
+# shares one long-lived event loop (and one AsyncOpenAI connection pool) instead of
+# holding a blocking HTTP call per worker thread.
+T = TypeVar("T")
+
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="openai-loop", daemon=True).start()
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run a coroutine on the shared event loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+
+client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS)),
+) if OPENAI_API_KEY else None
+
+
+@atexit.register
+def _close_client() -> None:
+    if client is not None and _LOOP.is_running():
+        run_async(client.close())
 
 # ---------------------------
 # Helpers
 # ---------------------------
 
-def extract_text_from_pdf(fp) -> str:
-    """Extract raw text from a PDF file-like object."""
-    reader = PdfReader(fp)
-    texts: List[str] = []
-    for page in reader.pages:
+# Only streams at least this large are filtered (pypdf backend)
+GFX_FILTER_MIN_BYTES = 64 * 1024
+
+
+def _strip_graphics(page, data: bytes) -> None:
+    """Replace a pypdf page's content stream `data` with its text-relevant operators only."""
+    filtered = DecodedStreamObject()
+    filtered.set_data(filter_text_operators(data))
+    page[NameObject("/Contents")] = filtered
+
+
+class PageTimeout(BaseException):
+    """Raised by page_deadline when a page runs out of time.
+
+    Derived from BaseException (like KeyboardInterrupt): pypdf wraps form-XObject and
+    cmap handling in broad `except Exception` blocks, and since the itimer is one-shot
+    a swallowed timeout would leave the page running unbounded.
+    """
+
+
+@contextlib.contextmanager
+def page_deadline(seconds: float):
+    """Raise PageTimeout in the block after `seconds` (SIGALRM; POSIX main thread only).
+
+    Used inside EXTRACTOR workers, where each task runs on the main thread, so a
+    pathological page is actually abandoned and the worker is freed for the next one.
+    """
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _raise(signum, frame):
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _load_document(path: str):
+    # Open by path: PDFium and MuPDF read pages from the file on demand instead of a copy in RAM
+    if PDF_BACKEND == "pymupdf":
+        return pymupdf.open(path)
+    if PDF_BACKEND == "pypdfium2":
+        return pdfium.PdfDocument(path)
+    return PdfReader(path)
+
+
+def _page_count(path: str) -> int:
+    doc = _load_document(path)
+    try:
+        return len(doc.pages) if isinstance(doc, PdfReader) else len(doc)
+    finally:
+        doc.close()
+
+
+# The document currently open in this worker process: ((path, mtime_ns), doc)
+_OPEN_DOCUMENT: Optional[Tuple[Tuple[str, int], Any]] = None
+
+
+def _open_document(path: str):
+    """Open `path` once per worker so consecutive pages of one upload share a parsed document.
+
+    Only one document is kept; a page of another upload closes the previous one.
+    """
+    global _OPEN_DOCUMENT
+    key = (path, os.stat(path).st_mtime_ns)
+    if _OPEN_DOCUMENT is None or _OPEN_DOCUMENT[0] != key:
+        _close_document()
+        _OPEN_DOCUMENT = (key, _load_document(path))
+    return _OPEN_DOCUMENT[1]
+
+
+def _close_document() -> None:
+    global _OPEN_DOCUMENT
+    if _OPEN_DOCUMENT is not None:
+        _, doc = _OPEN_DOCUMENT
+        _OPEN_DOCUMENT = None
+        doc.close()
+
+
+class ExtractedPage(NamedTuple):
+    text: str
+    # "ok" | "skipped" (oversized content stream; the same on every run) | "timeout" (may succeed on retry)
+    status: str = "ok"
+
+
+def _pypdf_page_text(doc: PdfReader, page_idx: int) -> ExtractedPage:
+    try:
+        page = doc.pages[page_idx]
+        contents = page.get_contents()
+        data = contents.get_data() if contents is not None else b""
+        if len(data) > PDF_PAGE_MAX_CONTENT_BYTES:
+            return ExtractedPage(f"[page {page_idx + 1}: diagram-heavy, text skipped]", "skipped")
+        if len(data) >= GFX_FILTER_MIN_BYTES:
+            _strip_graphics(page, data)
+        return ExtractedPage(page.extract_text() or "")
+    except Exception:
+        return ExtractedPage("")
+
+
+def _extract_page(path: str, page_idx: int) -> ExtractedPage:
+    """Extract one page's text. Runs inside an EXTRACTOR worker process."""
+    doc = _open_document(path)
+    try:
+        with page_deadline(PDF_PAGE_TIMEOUT_S):
+            if PDF_BACKEND == "pymupdf":
+                return ExtractedPage(doc[page_idx].get_text())
+            if PDF_BACKEND == "pypdfium2":
+                return ExtractedPage(doc[page_idx].get_textpage().get_text_range().replace("\r\n", "\n"))
+            return _pypdf_page_text(doc, page_idx)
+    except PageTimeout:
+        # The parser was interrupted mid-page; don't reuse its half-updated state for later pages
+        _close_document()
+        return _timed_out_page(page_idx)
+
+
+def _timed_out_page(page_idx: int) -> ExtractedPage:
+    return ExtractedPage(f"[page {page_idx + 1}: text extraction timed out, skipped]", "timeout")
+
+
+def _await_page(future: Future) -> ExtractedPage:
+    """Result of one page task; the backstop only counts time since the task started running.
+
+    Time spent queued behind other uploads on the shared pool does not count.
+    """
+    started: Optional[float] = None
+    while True:
+        try:
+            return future.result(timeout=0.5)
+        except FutureTimeoutError:
+            pass
+        if started is None:
+            if future.running():
+                started = time.monotonic()
+        elif time.monotonic() - started > PDF_PAGE_BACKSTOP_S:
+            raise FutureTimeoutError()
+
+
+def _replace_extractor(broken: ProcessPoolExecutor) -> None:
+    """Swap in a fresh EXTRACTOR after a worker died (PDFium/MuPDF crash, OOM kill)."""
+    global EXTRACTOR
+    with _EXTRACTOR_LOCK:
+        if EXTRACTOR is broken:
+            EXTRACTOR = ProcessPoolExecutor(max_workers=os.cpu_count())
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pdf_pages(path: str) -> Iterator[ExtractedPage]:
+    """Yield each page of the PDF at `path` (text + extraction status), in page order.
+
+    Pages are extracted in parallel on the EXTRACTOR process pool (extraction is
+    CPU-bound, so threads would serialize on the GIL). Workers stop a page after
+    PDF_PAGE_TIMEOUT_S and skip oversized content streams, yielding a placeholder
+    instead; waiting here is bounded too, as a backstop where SIGALRM is unavailable.
+
+    If a worker dies, the pool is replaced and the remaining pages are retried once;
+    a PDF that breaks the fresh pool as well fails with RuntimeError.
+    """
+    n_pages = _page_count(path)
+    next_page = 0
+    for attempt in range(2):
+        pool = EXTRACTOR
+        futures: List[Future] = []
         try:
-            texts.append(page.extract_text() or "")
-        except Exception:
-            texts.append("")
-    return "\n\n".join(texts).strip()
+            futures = [pool.submit(_extract_page, path, i) for i in range(next_page, n_pages)]
+            for i, future in enumerate(futures, start=next_page):
+                try:
+                    text = _await_page(future)
+                except FutureTimeoutError:
+                    print(f"[WARN] {i + 1}페이지 텍스트 추출이 {PDF_PAGE_BACKSTOP_S:g}초를 넘어 건너뜁니다.")
+                    future.cancel()
+                    text = _timed_out_page(i)
+                next_page = i + 1
+                yield text
+            return
+        except BrokenProcessPool as e:
+            _replace_extractor(pool)
+            if attempt:
+                raise RuntimeError("PDF 텍스트 추출 중 작업 프로세스가 비정상 종료되었습니다.") from e
+            print(f"[WARN] 텍스트 추출 프로세스가 종료되어 {next_page + 1}페이지부터 다시 시도합니다.")
+        finally:
+            # Early exit (error or abandoned generator): free the shared pool of this upload's queued pages
+            for future in futures:
+                future.cancel()
+
+
+@functools.cache
+def _encoder() -> tiktoken.Encoding:
+    # Loaded on first use: tiktoken may download the BPE file, which shouldn't happen at import
+    try:
+        return tiktoken.encoding_for_model(MODEL_DEFAULT)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str) -> int:
+    return len(_encoder().encode(text))
+
+
+def prompt_token_budget(max_output_tokens: int) -> int:
+    """Input tokens left for document text once the output and prompt scaffolding are reserved."""
+    return MODEL_CONTEXT - max_output_tokens - 512
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Cut `text` to at most `budget` tokens (token-accurate for Korean as well as English)."""
+    ids = _encoder().encode(text)
+    if len(ids) <= budget:
+        return text
+    # Drop a multi-byte character split by the cut instead of emitting U+FFFD
+    return _encoder().decode(ids[:budget]).rstrip("\ufffd")
+
+
+# Coarse-to-fine separators for splitting a page that alone exceeds the chunk budget
+_SPLIT_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+
+def _split_text(text: str, max_tokens: int, separators=_SPLIT_SEPARATORS) -> List[str]:
+    """Recursively split `text` on the coarsest separator that yields pieces under `max_tokens`."""
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    if not separators:
+        ids = _encoder().encode(text)
+        return [_encoder().decode(ids[i:i + max_tokens]) for i in range(0, len(ids), max_tokens)]
+
+    sep, rest = separators[0], separators[1:]
+    parts: List[str] = []
+    current = ""
+    for piece in text.split(sep):
+        candidate = f"{current}{sep}{piece}" if current else piece
+        if count_tokens(candidate) <= max_tokens:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        if count_tokens(piece) <= max_tokens:
+            current = piece
+        else:
+            parts.extend(_split_text(piece, max_tokens, rest))
+            current = ""
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_pages(pages: Iterable[str], max_tokens: int = CHUNK_MAX_TOKENS) -> List[str]:
+    """Pack consecutive pages into chunks of at most `max_tokens` tokens."""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    sep_tokens = count_tokens("\n\n")
+    for page in pages:
+        page = page.strip()
+        if not page:
+            continue
+        for piece in _split_text(page, max_tokens - sep_tokens):
+            n = count_tokens(piece) + sep_tokens
+            if current and current_tokens + n > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += n
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def hash_upload(stream) -> str:
+    """SHA-256 hex digest of an uploaded file, read back in blocks from its temp file."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    while block := stream.read(1024 * 1024):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def file_etag(path: str, mtime_ns: int, size: int) -> str:
+    """Content SHA-256 of a saved result; mtime/size are part of the key so a rewrite gets a new tag."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while block := fh.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 def now_tag() -> str:
     return datetime.now().strftime("%Y%m%d-%H%M%S")
 
 
-def save_json(obj: Any, path: Path) -> None:
-    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+# Fenced code is built in; raw HTML from the model is escaped (the preview injects this via innerHTML)
+_md = mistune.create_markdown(plugins=["table", "strikethrough", "footnotes"])
+
+
+@functools.lru_cache(maxsize=128)
+def render_md(text: str) -> str:
+    """Render summary Markdown to HTML, memoized on the Markdown text."""
+    return _md(text)
+
+
+def write_summary_html(summary_path: Path) -> str:
+    """Render a saved summary .md and persist the HTML next to it."""
+    html = render_md(summary_path.read_text(encoding="utf-8"))
+    summary_path.with_suffix(".html").write_text(html, encoding="utf-8")
+    return html
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any) -> T:
+    """Run blocking I/O on the default executor so the shared loop keeps serving other requests."""
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(None, fn, *args)
+    except RuntimeError:
+        # Thread pools refuse new work once the interpreter is exiting (_flush_pending_writes): write inline
+        return fn(*args)
+    return await future
+
+
+async def write_text_async(path: Path, text: str) -> None:
+    await run_blocking(functools.partial(path.write_text, text, encoding="utf-8"))
+
+
+async def write_bytes_async(path: Path, data: bytes) -> None:
+    await run_blocking(path.write_bytes, data)
+
+
+def precompressed_copies(path: Path, raw: bytes) -> Dict[Path, bytes]:
+    """Compressed siblings of a saved file (<name>.gz, <name>.br), served by content negotiation."""
+    copies = {path.with_name(path.name + ".gz"): gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        copies[path.with_name(path.name + ".br")] = brotli.compress(raw, quality=11)
+    return copies
+
+
+_FNAME_RE = re.compile(r"[\\/:*?\"<>|]")
 
 
 def sanitize_filename(title: str) -> str:
-    title = re.sub(r"[\\/:*?\"<>|]", "_", title).strip()
+    title = _FNAME_RE.sub("_", title).strip()
     return title or now_tag()
 
 
+# ---------------------------
+# Result cache (content hash → saved files)
+# ---------------------------
+_CACHE_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def file_lock(path: Path, thread_lock: threading.Lock):
+    """Hold `thread_lock` plus, on POSIX, an flock on the sidecar `<path>.lock`.
+
+    The sidecar file is never replaced, so the lock stays valid for writers that
+    swap `path` itself atomically; the flock covers several app worker processes.
+    """
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path.with_name(path.name + ".lock"), "a") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def cache_key(digest: str, model: str = MODEL_DEFAULT) -> str:
+    # Include the model so upgrading OPENAI_MODEL never serves output from the old one
+    return f"{digest}:{model}"
+
+
+def _load_cache_index() -> Dict[str, Dict[str, str]]:
+    try:
+        return orjson.loads(CACHE_INDEX_PATH.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def cache_lookup(key: str) -> Optional[Dict[str, str]]:
+    """Return {"problems": name, "summary": name} if a result for `key` is still on disk.
+
+    Deleting the saved files invalidates the entry.
+    """
+    with _CACHE_LOCK:
+        entry = _load_cache_index().get(key)
+    if not entry:
+        return None
+    if not (PROBLEMS_DIR / entry["problems"]).exists() or not (SUMMARIES_DIR / entry["summary"]).exists():
+        return None
+    return entry
+
+
+def cache_store(key: str, entry: Dict[str, str]) -> None:
+    with file_lock(CACHE_INDEX_PATH, _CACHE_LOCK):
+        index = _load_cache_index()
+        index[key] = entry
+        fd, tmp = tempfile.mkstemp(dir=DATA_DIR, prefix=".cache_index.", suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(orjson.dumps(index, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, CACHE_INDEX_PATH)
+
+
+# ---------------------------
+# Listing index (append-only data/index.jsonl, one line per saved result)
+# ---------------------------
+_INDEX_LOCK = threading.Lock()
+
+
+def index_append(problems_name: Optional[str], summary_name: Optional[str]) -> None:
+    tag = Path(problems_name or summary_name or "").stem.partition("_")[2]
+    line = json.dumps({"ts": tag, "problems": problems_name, "summary": summary_name}, ensure_ascii=False)
+    with file_lock(INDEX_PATH, _INDEX_LOCK):
+        if not INDEX_PATH.exists():
+            # First save without an index (fresh checkout / deleted by hand): rebuild picks up this result too
+            _write_index()
+            return
+        with open(INDEX_PATH, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+def rebuild_index() -> int:
+    """Regenerate index.jsonl from the files on disk (e.g. after adding files by hand)."""
+    with file_lock(INDEX_PATH, _INDEX_LOCK):
+        return _write_index()
+
+
+def _write_index() -> int:
+    # Caller holds the index lock; readers don't, so swap the new file in atomically
+    entries: Dict[str, Dict[str, Optional[str]]] = {}
+    for p in PROBLEMS_DIR.glob("problems_*.json"):
+        entries.setdefault(p.stem.removeprefix("problems_"), {"summary": None})["problems"] = p.name
+    for p in SUMMARIES_DIR.glob("summary_*.md"):
+        entries.setdefault(p.stem.removeprefix("summary_"), {"problems": None})["summary"] = p.name
+    lines = [
+        json.dumps({"ts": tag, "problems": e.get("problems"), "summary": e.get("summary")}, ensure_ascii=False) + "\n"
+        for tag, e in sorted(entries.items())
+    ]
+    fd, tmp = tempfile.mkstemp(dir=DATA_DIR, prefix=".index.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.writelines(lines)
+    os.replace(tmp, INDEX_PATH)
+    return len(lines)
+
+
+def index_tail(limit: int = LIST_LIMIT) -> List[Dict[str, Optional[str]]]:
+    """Most recent index entries first."""
+    if not INDEX_PATH.exists():
+        rebuild_index()
+    with open(INDEX_PATH, encoding="utf-8") as fh:
+        tail = deque(fh, maxlen=limit)
+    # A line without its newline is an append still in progress
+    return [json.loads(line) for line in reversed(tail) if line.endswith("\n") and line.strip()]
+
+
 # ---------------------------
 # Prompting
 # ---------------------------
 
-def build_prompt_for_generation(pdf_text: str) -> str:
-    return f"""
-당신은 대학 수준의 교수 겸 출제위원입니다. 아래 PDF 본문을 바탕으로 다음을 한국어로 생성하세요.
+PROBLEM_ITEM_SPEC = """
+     - question: 문제 내용
+     - choices: 보기 4개
+     - answer_index: 정답 보기의 인덱스 (0~3)
+     - explanation: 정답 이유 또는 개념 요약
+""".strip("\n")
 
-1️⃣ **요약 정리본**
+PROBLEM_RULES = """
+   - 조건:
+     - 보기 문장은 간결하고 모두 실제 학습 내용 기반이어야 함
+     - 오답은 헷갈리지만 틀린 선택지로 구성
+     - 중복 표현 금지
+     - 정답은 균등하게 분포하도록 구성 (0~3 고르게)
+""".strip("\n")
+
+SUMMARY_SPEC = """
    - 가능한 한 자세하게, 문단 단위로 정리하세요.
    - 구성:
      - (1) 전체 개요 요약 (핵심 주제 3~5줄)
@@ -111,87 +693,438 @@ def build_prompt_for_generation(pdf_text: str) -> str:
      - (5) 관련 용어 정리표 (필요 시 Markdown 표 형태)
    - Markdown 형식(h2/h3, 목록, 표, 수식은 $...$ 또는 ```...```)으로 깔끔하게 작성하세요.
 
-2️⃣ **연습문제 및 심화문제**
-   - 총 30문항 (기초 15문항, 심화 15문항)의 4지선다형 문제를 생성하세요.
-   - 각 문항은 아래 JSON 구조를 따르세요:
-     {{
-       "question": "문제 내용",
-       "choices": ["보기1","보기2","보기3","보기4"],
-       "answer_index": 0,
-       "explanation": "정답 이유 또는 개념 요약"
-     }}
-   - 조건:
-     - 보기 문장은 간결하고 모두 실제 학습 내용 기반이어야 함
-     - 오답은 헷갈리지만 틀린 선택지로 구성
-     - 중복 표현 금지
-     - 정답은 균등하게 분포하도록 구성 (0~3 고르게)
-     - 기초: 정의, 개념, 이해 중심
-     - 심화: 응용, 비교, 계산, 상황 판단 문제 중심
-
-반드시 아래 JSON 구조로만 출력하세요(키 이름/타입 엄수):
-{{
-  "summary_markdown": "...여기에 Markdown...",
-  "problems": {{
-    "basic": [
-      {{"question":"...","choices":["...","...","...","..."],"answer_index":0,"explanation":"..."}},
-      ... (총 15문항)
-    ],
-    "advanced": [
-      {{"question":"...","choices":["...","...","...","..."],"answer_index":0,"explanation":"..."}},
-      ... (총 15문항)
-    ]
-  }}
-}}
+Markdown 본문만 출력하세요(전체를 코드펜스로 감싸지 말 것).
+""".strip("\n")
+
+
+def build_summary_prompt(pdf_text: str) -> str:
+    return f"""
+당신은 대학 수준의 교수입니다. 아래 PDF 본문을 바탕으로 **요약 정리본**을 한국어로 작성하세요.
+
+{SUMMARY_SPEC}
 
 PDF 본문:
 ====
-{pdf_text[:120000]}
+{pdf_text}
 ====
 """.strip()
 
 
-def call_openai_generate(pdf_text: str) -> Dict[str, Any]:
-    if not client:
-        raise RuntimeError("OPENAI_API_KEY not set")
+def build_chunk_summary_prompt(chunk: str, index: int, total: int) -> str:
+    return f"""
+아래는 PDF 본문의 일부(전체 {total}개 중 {index + 1}번째 부분)입니다.
+나중에 다른 부분과 합쳐 최종 요약을 만들 수 있도록, 이 부분의 핵심 개념 / 정의 / 공식 / 예시 / 시험 포인트를
+빠짐없이 Markdown 목록으로 한국어로 정리하세요. 서론이나 맺음말은 쓰지 마세요.
+
+PDF 본문 (부분):
+====
+{chunk}
+====
+""".strip()
+
+
+_REDUCE_PROMPT = """
+당신은 대학 수준의 교수입니다. 아래는 하나의 PDF를 여러 부분으로 나누어 각각 정리한 메모입니다.
+이를 하나로 통합하여 문서 전체에 대한 **요약 정리본**을 한국어로 작성하세요. 중복은 합치고 원래 순서를 유지하세요.
+
+{spec}
+
+부분별 정리:
+====
+{parts}
+====
+""".strip()
+
+
+def build_reduce_prompt(chunk_summaries: List[str]) -> str:
+    headers = [f"### 부분 {i + 1}\n" for i in range(len(chunk_summaries))]
+    # Budget the notes against what is left after the instructions, headers and separators;
+    # share it evenly so every part of the document stays represented
+    scaffold = count_tokens(_REDUCE_PROMPT.format(spec=SUMMARY_SPEC, parts="\n\n".join(headers)))
+    budget = prompt_token_budget(MAX_OUTPUT_TOKENS_PER_CALL) - scaffold
+    per_note = max(budget // max(len(chunk_summaries), 1), 0)
+    parts = "\n\n".join(f"{h}{truncate_tokens(s.strip(), per_note)}" for h, s in zip(headers, chunk_summaries))
+    return _REDUCE_PROMPT.format(spec=SUMMARY_SPEC, parts=parts)
+
+
+def _build_problems_prompt(pdf_text: str, level: str, focus: str, count: int) -> str:
+    return f"""
+당신은 대학 수준의 출제위원입니다. 아래 PDF 본문을 바탕으로 {level} 4지선다형 문제 {count}문항을 한국어로 생성하세요.
+
+   - 각 문항의 필드:
+{PROBLEM_ITEM_SPEC}
+{PROBLEM_RULES}
+     - {focus}
+
+PDF 본문:
+====
+{pdf_text}
+====
+""".strip()
+
+
+def build_basic_prompt(pdf_text: str, count: int = PROBLEMS_PER_LEVEL) -> str:
+    return _build_problems_prompt(pdf_text, "연습문제(기초)", "정의, 개념, 이해 중심", count)
+
 
-    prompt = build_prompt_for_generation(pdf_text)
+def build_advanced_prompt(pdf_text: str, count: int = PROBLEMS_PER_LEVEL) -> str:
+    return _build_problems_prompt(pdf_text, "심화문제(고급)", "응용, 비교, 계산, 상황 판단 문제 중심", count)
 
-    # Use Responses API; request JSON output (loose schema via instruction)
-    resp = client.responses.create(
-        model=MODEL_DEFAULT,
-        input=[
+
+PROBLEM_BUILDERS = {"basic": build_basic_prompt, "advanced": build_advanced_prompt}
+
+
+def problems_schema(count: int) -> Dict[str, Any]:
+    """Structured-outputs JSON schema for a set of exactly `count` questions."""
+    item = {
+        "type": "object",
+        "properties": {
+            "question": {"type": "string"},
+            "choices": {"type": "array", "items": {"type": "string"}, "minItems": 4, "maxItems": 4},
+            "answer_index": {"type": "integer", "minimum": 0, "maximum": 3},
+            "explanation": {"type": "string"},
+        },
+        "required": ["question", "choices", "answer_index", "explanation"],
+        "additionalProperties": False,
+    }
+    return {
+        "type": "object",
+        "properties": {"problems": {"type": "array", "items": item, "minItems": count, "maxItems": count}},
+        "required": ["problems"],
+        "additionalProperties": False,
+    }
+
+
+def allocate_problems(n_chunks: int, total: int = PROBLEMS_PER_LEVEL) -> Dict[int, int]:
+    """Spread `total` questions over evenly spaced chunks -> {chunk_index: count}."""
+    quota: Dict[int, int] = {}
+    for k in range(total):
+        idx = k * n_chunks // total
+        quota[idx] = quota.get(idx, 0) + 1
+    return quota
+
+
+_OPENAI_SEMAPHORE = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+
+def _request_kwargs(prompt: str, max_output_tokens: int, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Responses API arguments shared by every generation call."""
+    kwargs: Dict[str, Any] = {
+        "model": MODEL_DEFAULT,
+        "input": [
             {"role": "system", "content": "You are a concise, accurate teaching assistant and exam writer."},
             {"role": "user", "content": prompt},
         ],
-        temperature=0.4,
-        max_output_tokens=7000,
+        "temperature": 0.4,
+        "max_output_tokens": max_output_tokens,
+    }
+    if schema is not None:
+        # Constrain the output to JSON matching `schema` (structured outputs)
+        kwargs["text"] = {"format": {"type": "json_schema", "name": "problems", "schema": schema, "strict": True}}
+    return kwargs
+
+
+async def generate_text(
+    prompt: str,
+    max_output_tokens: int = MAX_OUTPUT_TOKENS_PER_CALL,
+    schema: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Run a single Responses API call and return its unified text output."""
+    async with _OPENAI_SEMAPHORE:
+        resp = await client.responses.create(**_request_kwargs(prompt, max_output_tokens, schema))
+    if schema is not None and resp.status == "incomplete":
+        raise ValueError("Model output was cut off before the JSON was complete")
+    return resp.output_text
+
+
+async def stream_text(
+    prompt: str,
+    on_delta: Callable[[str], None],
+    max_output_tokens: int = MAX_OUTPUT_TOKENS_PER_CALL,
+) -> str:
+    """Like generate_text, but reports each output text delta to `on_delta` as it arrives."""
+    async with _OPENAI_SEMAPHORE:
+        async with client.responses.stream(**_request_kwargs(prompt, max_output_tokens)) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    on_delta(event.delta)
+            resp = await stream.get_final_response()
+    return resp.output_text
+
+
+async def summarize_chunk(chunk: str, index: int, total: int) -> str:
+    return await generate_text(build_chunk_summary_prompt(chunk, index, total), CHUNK_SUMMARY_MAX_OUTPUT_TOKENS)
+
+
+async def generate_summary(chunks: List[str], on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """Summarize the document; with `on_delta`, the final summary call is streamed."""
+    if len(chunks) == 1:
+        prompt = build_summary_prompt(chunks[0])
+    else:
+        # Map: summarize every chunk concurrently. Reduce: merge the notes into one summary.
+        notes = await asyncio.gather(*[summarize_chunk(c, i, len(chunks)) for i, c in enumerate(chunks)])
+        prompt = build_reduce_prompt(list(notes))
+    if on_delta is not None:
+        return await stream_text(prompt, on_delta)
+    return await generate_text(prompt)
+
+
+async def generate_problems(chunks: List[str], level: str) -> List[Dict[str, Any]]:
+    """Draft questions per chunk (quota spread across the document), then rebalance to a full set."""
+    build = PROBLEM_BUILDERS[level]
+    quota = allocate_problems(len(chunks))
+    texts = await asyncio.gather(*[
+        generate_text(build(chunks[i], n), PROBLEM_MAX_OUTPUT_TOKENS_PER_ITEM * n, problems_schema(n))
+        for i, n in quota.items()
+    ])
+
+    problems: List[Dict[str, Any]] = []
+    for text in texts:
+        problems.extend(orjson.loads(text)["problems"])
+    return problems[:PROBLEMS_PER_LEVEL]
+
+
+async def call_openai_generate(chunks: List[str], on_summary_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    if not client:
+        raise RuntimeError("OPENAI_API_KEY not set")
+
+    # Summary and both problem levels are independent, so generate them concurrently;
+    # wall-clock becomes the slowest of the three instead of their sum.
+    summary_text, basic, advanced = await asyncio.gather(
+        generate_summary(chunks, on_summary_delta),
+        generate_problems(chunks, "basic"),
+        generate_problems(chunks, "advanced"),
     )
+    return {"summary_markdown": summary_text.strip(), "problems": {"basic": basic, "advanced": advanced}}
+
+
+# ---------------------------
+# Batch mode (OpenAI Batch API: ~50% cost, results within 24h)
+# ---------------------------
 
-    text = resp.output_text  # unified text
+def _batch_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(BATCH_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+with contextlib.closing(_batch_db()) as _conn, _conn:
+    _conn.execute("""
+        CREATE TABLE IF NOT EXISTS batches (
+            digest   TEXT NOT NULL,
+            model    TEXT NOT NULL,
+            batch_id TEXT NOT NULL,
+            status   TEXT NOT NULL,  -- submitted | collecting | completed | failed
+            error    TEXT,
+            created  TEXT NOT NULL,
+            updated  REAL,           -- time.time() of the last status change
+            PRIMARY KEY (digest, model)
+        )
+    """)
+    if "updated" not in {row["name"] for row in _conn.execute("PRAGMA table_info(batches)")}:
+        _conn.execute("ALTER TABLE batches ADD COLUMN updated REAL")
+
+
+def get_batch(digest: str, model: str = MODEL_DEFAULT) -> Optional[sqlite3.Row]:
+    with contextlib.closing(_batch_db()) as conn:
+        return conn.execute("SELECT * FROM batches WHERE digest = ? AND model = ?", (digest, model)).fetchone()
+
+
+def _set_batch_status(digest: str, model: str, status: str, error: Optional[str] = None, expect: Optional[str] = None) -> bool:
+    """Update a batch row; with `expect`, only if it is currently in that status (returns whether it changed)."""
+    sql = "UPDATE batches SET status = ?, error = ?, updated = ? WHERE digest = ? AND model = ?"
+    args: Tuple[Any, ...] = (status, error, time.time(), digest, model)
+    if expect is not None:
+        sql += " AND status = ?"
+        args += (expect,)
+    with contextlib.closing(_batch_db()) as conn, conn:
+        return conn.execute(sql, args).rowcount == 1
+
+
+def batch_requests(chunks: List[str]) -> List[Dict[str, Any]]:
+    """Batch input lines for the per-chunk stage of the pipeline (see call_openai_generate).
+
+    custom_id is "summary:0" (single chunk), "note:<chunk>" (map step) or
+    "<level>:<chunk>" for problem drafts.
+    """
+    lines: List[Tuple[str, Dict[str, Any]]] = []
+    if len(chunks) == 1:
+        lines.append(("summary:0", _request_kwargs(build_summary_prompt(chunks[0]), MAX_OUTPUT_TOKENS_PER_CALL)))
+    else:
+        for i, chunk in enumerate(chunks):
+            prompt = build_chunk_summary_prompt(chunk, i, len(chunks))
+            lines.append((f"note:{i}", _request_kwargs(prompt, CHUNK_SUMMARY_MAX_OUTPUT_TOKENS)))
+    for level, build in PROBLEM_BUILDERS.items():
+        for i, n in allocate_problems(len(chunks)).items():
+            body = _request_kwargs(build(chunks[i], n), PROBLEM_MAX_OUTPUT_TOKENS_PER_ITEM * n, problems_schema(n))
+            lines.append((f"{level}:{i}", body))
+    return [{"custom_id": cid, "method": "POST", "url": "/v1/responses", "body": body} for cid, body in lines]
+
+
+async def submit_batch(digest: str, chunks: List[str]) -> None:
+    if not client:
+        raise RuntimeError("OPENAI_API_KEY not set")
+
+    payload = "\n".join(json.dumps(line, ensure_ascii=False) for line in batch_requests(chunks))
+    input_file = await client.files.create(file=("batch.jsonl", payload.encode("utf-8")), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+        metadata={"digest": digest},
+    )
+    with contextlib.closing(_batch_db()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO batches (digest, model, batch_id, status, error, created, updated)"
+            " VALUES (?, ?, ?, 'submitted', NULL, ?, ?)",
+            (digest, MODEL_DEFAULT, batch.id, now_tag(), time.time()),
+        )
+    _start_batch_poller(digest, MODEL_DEFAULT, batch.id)
+
+
+def _response_output_text(body: Dict[str, Any]) -> str:
+    # Raw Responses API JSON: concatenate the output_text parts of message items
+    return "".join(
+        part.get("text", "")
+        for item in body.get("output", [])
+        if item.get("type") == "message"
+        for part in item.get("content", [])
+        if part.get("type") == "output_text"
+    )
 
-    # Try to extract JSON
-    # If the model wraps code fences, strip them
-    match = re.search(r"\{[\s\S]*\}\s*$", text)
-    raw = match.group(0) if match else text
 
+async def collect_batch(output_file_id: str) -> Dict[str, Any]:
+    """Assemble a finished batch's output into the {summary_markdown, problems} shape."""
+    content = await client.files.content(output_file_id)
+    outputs: Dict[str, str] = {}
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        item = orjson.loads(line)
+        response = item.get("response") or {}
+        if item.get("error") or response.get("status_code") != 200:
+            raise ValueError(f"Batch request {item.get('custom_id')} failed: {item.get('error') or response.get('body')}")
+        outputs[item["custom_id"]] = _response_output_text(response["body"])
+
+    def ordered(prefix: str) -> List[str]:
+        keys = sorted((k for k in outputs if k.startswith(prefix)), key=lambda k: int(k.split(":")[1]))
+        return [outputs[k] for k in keys]
+
+    if "summary:0" in outputs:
+        summary_text = outputs["summary:0"]
+    else:
+        # The reduce step depends on every note, so it runs as one realtime call
+        summary_text = await generate_text(build_reduce_prompt(ordered("note:")))
+
+    problems: Dict[str, List[Dict[str, Any]]] = {}
+    for level in PROBLEM_BUILDERS:
+        items: List[Dict[str, Any]] = []
+        for text in ordered(f"{level}:"):
+            items.extend(orjson.loads(text)["problems"])
+        problems[level] = items[:PROBLEMS_PER_LEVEL]
+    return {"summary_markdown": summary_text.strip(), "problems": problems}
+
+
+async def poll_batch(digest: str, model: str, batch_id: str) -> None:
+    """Poll a submitted batch until it finishes, then save its result like a realtime run."""
+    while True:
+        await asyncio.sleep(BATCH_POLL_INTERVAL_S)
+        try:
+            batch = await client.batches.retrieve(batch_id)
+        except Exception as e:
+            print(f"[WARN] 배치 상태 조회 실패 ({batch_id}): {e}")
+            continue
+        if batch.status in ("failed", "expired", "cancelled"):
+            _set_batch_status(digest, model, "failed", f"batch {batch.status}")
+            return
+        if batch.status == "completed":
+            break
+
+    # Claim the batch so a second process polling the same row does not save it twice
+    if not _set_batch_status(digest, model, "collecting", expect="submitted"):
+        return
     try:
-        data = json.loads(raw)
+        data = await collect_batch(batch.output_file_id)
+        problems_path, summary_path = new_result_paths(digest)
+        await persist_result(data, cache_key(digest, model), problems_path, summary_path,
+                             render_md(data["summary_markdown"]))
     except Exception as e:
-        # crude fence removal fallback
-        raw2 = re.sub(r"^[`\s]*json[`\s]*|^```|```$", "", raw, flags=re.MULTILINE)
-        data = json.loads(raw2)
+        _set_batch_status(digest, model, "failed", str(e))
+        return
+    _set_batch_status(digest, model, "completed")
+
 
-    # Validate minimal shape
-    if not isinstance(data, dict) or "summary_markdown" not in data or "problems" not in data:
-        raise ValueError("Model output missing required keys")
+_BATCH_POLLERS: Set[asyncio.Task] = set()
 
-    return data
+
+def _start_batch_poller(digest: str, model: str, batch_id: str) -> None:
+    # Hold a reference while the task runs (the loop only keeps weak ones), drop it when done
+    task = asyncio.create_task(poll_batch(digest, model, batch_id))
+    _BATCH_POLLERS.add(task)
+    task.add_done_callback(_BATCH_POLLERS.discard)
+
+
+async def _resume_batch_polling() -> None:
+    with contextlib.closing(_batch_db()) as conn:
+        rows = conn.execute(
+            "SELECT digest, model, batch_id, status FROM batches"
+            " WHERE status = 'submitted' OR (status = 'collecting' AND COALESCE(updated, 0) < ?)",
+            (time.time() - BATCH_COLLECT_STALE_S,),
+        ).fetchall()
+    for row in rows:
+        # A stale claim goes back to "submitted" so poll_batch can claim it again (once, across processes)
+        if row["status"] == "collecting" and not _set_batch_status(row["digest"], row["model"], "submitted", expect="collecting"):
+            continue
+        _start_batch_poller(row["digest"], row["model"], row["batch_id"])
+
+
+# Pick up batches submitted before a restart (not in EXTRACTOR workers started via spawn)
+if client is not None and multiprocessing.parent_process() is None:
+    asyncio.run_coroutine_threadsafe(_resume_batch_polling(), _LOOP)
 
 
 # ---------------------------
 # Flask App
 # ---------------------------
+class UploadRequest(Request):
+    """Request that spools every uploaded file straight to a named temp file.
+
+    The werkzeug default keeps small uploads in memory and larger ones in an anonymous
+    temp file; a named file lets extractor processes read the PDF without another copy.
+    The files are removed when the request closes.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        tmp = tempfile.NamedTemporaryFile("wb+", suffix=".pdf", delete=False)
+        self.__dict__.setdefault("_spooled_paths", []).append(tmp.name)
+        return tmp
+
+    def close(self) -> None:
+        super().close()
+        for path in self.__dict__.get("_spooled_paths", []):
+            Path(path).unlink(missing_ok=True)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Route jsonify() and request.get_json() through orjson (payloads carry full problem sets + summary HTML)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+app.request_class = UploadRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_MB * 1024 * 1024
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({"ok": False, "error": f"파일이 너무 큽니다. 최대 {MAX_UPLOAD_MB}MB 까지 업로드할 수 있습니다."}), 413
 
 
 @app.get("/")
@@ -199,54 +1132,228 @@ def index():
     return render_template_string(INDEX_HTML)
 
 
-@app.post("/api/process")
-def api_process():
+def problems_columns(items: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Columnar (SoA) form of a problem list, so the wire doesn't repeat every key per item."""
+    return {
+        "questions": [q.get("question", "") for q in items],
+        "choices": [q.get("choices", []) for q in items],
+        "answer_index": [q.get("answer_index", 0) for q in items],
+        "explanation": [q.get("explanation", "") for q in items],
+    }
+
+
+def result_payload(problems_path: Path, summary_path: Path, problems: Dict[str, Any], summary_html: str) -> Dict[str, Any]:
+    # Lightweight response for immediate preview; problems go out columnar (files on disk stay a list of items)
+    return {
+        "ok": True,
+        "problems_url": url_for("serve_problem_file", filename=problems_path.name),
+        "summary_url": url_for("serve_summary_file", filename=summary_path.name),
+        "problems": {level: problems_columns(problems.get(level, [])) for level in PROBLEM_BUILDERS},
+        "summary_html": summary_html,
+    }
+
+
+def cached_payload(entry: Dict[str, str]) -> Dict[str, Any]:
+    problems_path = PROBLEMS_DIR / entry["problems"]
+    summary_path = SUMMARIES_DIR / entry["summary"]
+    html_path = summary_path.with_suffix(".html")
+    if html_path.exists():
+        summary_html = html_path.read_text(encoding="utf-8")
+    else:
+        summary_html = write_summary_html(summary_path)
+    problems = orjson.loads(problems_path.read_bytes())
+    return result_payload(problems_path, summary_path, problems, summary_html)
+
+
+def upload_error() -> Optional[Tuple[Response, int]]:
+    """Validate the uploaded PDF field; returns an error response or None."""
     if "pdf" not in request.files:
         return jsonify({"ok": False, "error": "PDF 파일을 업로드하세요."}), 400
-
-    f = request.files["pdf"]
-    if not f.filename.lower().endswith(".pdf"):
+    if not request.files["pdf"].filename.lower().endswith(".pdf"):
         return jsonify({"ok": False, "error": "확장자가 .pdf 인 파일만 허용됩니다."}), 400
+    return None
+
+
+class Upload(NamedTuple):
+    digest: str
+    entry: Optional[Dict[str, str]]  # cache hit
+    chunks: List[str]  # empty on a cache hit, or when no page yielded real text
+    complete: bool  # False if some page timed out; such a result is not cached
+
+
+def read_upload(f) -> Upload:
+    """Hash and extract an uploaded PDF.
+
+    On a cache hit the PDF is not parsed. Skip placeholders are kept in the chunks (so
+    the model knows a page is missing) but don't count as extracted text.
+    """
+    # UploadRequest already spooled the file to disk, so extractor processes open it by path
+    digest = hash_upload(f.stream)
+    entry = cache_lookup(cache_key(digest))
+    if entry:
+        return Upload(digest, entry, [], True)
+    pages = list(iter_pdf_pages(f.stream.name))
+    complete = all(p.status != "timeout" for p in pages)
+    if not any(p.status == "ok" and p.text.strip() for p in pages):
+        return Upload(digest, None, [], complete)
+    return Upload(digest, None, chunk_pages(p.text for p in pages), complete)
+
+
+async def persist_result(data: Dict[str, Any], key: Optional[str], problems_path: Path, summary_path: Path, summary_html: str) -> None:
+    """Write a generated result to disk, then register it in the cache (unless `key` is None)."""
+    problems_raw = orjson.dumps(data.get("problems", {}), option=orjson.OPT_INDENT_2)
+    await asyncio.gather(
+        # Save problems JSON, plus gzip/brotli copies so it is never compressed per request
+        write_bytes_async(problems_path, problems_raw),
+        *(write_bytes_async(p, b) for p, b in precompressed_copies(problems_path, problems_raw).items()),
+        # Save summary MD (+ rendered HTML for cache hits)
+        write_text_async(summary_path, data.get("summary_markdown", "")),
+        write_text_async(summary_path.with_suffix(".html"), summary_html),
+    )
+    await run_blocking(register_result, key, problems_path.name, summary_path.name)
+
+
+def register_result(key: Optional[str], problems_name: str, summary_name: str) -> None:
+    # Blocking (file locks, and a directory scan when the listing index is rebuilt)
+    if key is not None:
+        cache_store(key, {"problems": problems_name, "summary": summary_name})
+    index_append(problems_name, summary_name)
+
+
+def new_result_paths(digest: str) -> Tuple[Path, Path]:
+    # The digest keeps two uploads saved in the same second from sharing (and overwriting) files
+    tag = f"{now_tag()}_{digest[:12]}"
+    return PROBLEMS_DIR / f"problems_{tag}.json", SUMMARIES_DIR / f"summary_{tag}.md"
+
+
+_PENDING_WRITES: Set[Future] = set()
+
+
+@atexit.register
+def _flush_pending_writes() -> None:
+    # Registered after _close_client, so it runs first (atexit is LIFO)
+    wait(list(_PENDING_WRITES))
+
+
+def _on_persisted(future: Future) -> None:
+    _PENDING_WRITES.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        print(f"[WARN] 생성 결과 저장 실패: {future.exception()}")
+
+
+def save_result(data: Dict[str, Any], digest: str, cache: bool = True) -> Dict[str, Any]:
+    """Build the response payload and persist the result in the background.
+
+    The file URLs are known from the tag up front, so the response does not wait on
+    disk writes. With `cache=False` (pages timed out) the result is saved and listed
+    but a re-upload of the same PDF generates again.
+    """
+    problems_path, summary_path = new_result_paths(digest)
+    summary_html = render_md(data.get("summary_markdown", ""))
+
+    future = asyncio.run_coroutine_threadsafe(
+        persist_result(data, cache_key(digest) if cache else None, problems_path, summary_path, summary_html), _LOOP
+    )
+    _PENDING_WRITES.add(future)
+    future.add_done_callback(_on_persisted)
+    return result_payload(problems_path, summary_path, data.get("problems", {}), summary_html)
+
+
+@app.post("/api/process")
+def api_process():
+    if error := upload_error():
+        return error
 
     try:
-        pdf_text = extract_text_from_pdf(f.stream)
-        if not pdf_text.strip():
+        upload = read_upload(request.files["pdf"])
+        if upload.entry:
+            return jsonify(cached_payload(upload.entry))
+        if not upload.chunks:
             return jsonify({"ok": False, "error": "PDF에서 텍스트를 추출하지 못했습니다."}), 400
 
-        data = call_openai_generate(pdf_text)
+        if request.args.get("mode") == "batch":
+            # Batch results are always cached by digest, so don't queue a partial extraction
+            if not upload.complete:
+                return jsonify({"ok": False, "error": "일부 페이지의 텍스트 추출이 시간 초과되었습니다. 잠시 후 다시 시도해 주세요."}), 503
+            # Cheap mode: queue on the Batch API and let the user come back later
+            batch = get_batch(upload.digest)
+            # "completed" without a cache hit means the saved files were deleted; generate again
+            if batch is None or batch["status"] in ("failed", "completed"):
+                run_async(submit_batch(upload.digest, upload.chunks))
+            return jsonify({"ok": True, "mode": "batch", "status_url": url_for("batch_page", digest=upload.digest)}), 202
+
+        data = run_async(call_openai_generate(upload.chunks))
+        return jsonify(save_result(data, upload.digest, cache=upload.complete))
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
 
-        tag = now_tag()
-        # Save problems JSON
-        problems_path = PROBLEMS_DIR / f"problems_{tag}.json"
-        save_json(data.get("problems", {}), problems_path)
 
-        # Save summary MD
-        title = f"summary_{tag}.md"
-        summary_path = SUMMARIES_DIR / title
-        summary_path.write_text(data.get("summary_markdown", ""), encoding="utf-8")
+def sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
 
-        # Lightweight response for immediate preview
-        return jsonify({
-            "ok": True,
-            "problems_url": url_for("serve_problem_file", filename=problems_path.name),
-            "summary_url": url_for("serve_summary_file", filename=summary_path.name),
-            "problems": data.get("problems", {}),
-            "summary_html": markdown(data.get("summary_markdown", ""), extensions=["fenced_code", "tables"]) ,
-        })
+
+@app.post("/api/process/stream")
+def api_process_stream():
+    """Same as /api/process, but streams the summary as server-sent events.
+
+    Events: `delta` ({"delta": markdown text}) while the summary is generated, then a
+    single `done` (the /api/process payload) or `error` ({"ok": false, "error": message}).
+    """
+    if error := upload_error():
+        return error
+
+    try:
+        upload = read_upload(request.files["pdf"])
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
+    if not upload.entry and not upload.chunks:
+        return jsonify({"ok": False, "error": "PDF에서 텍스트를 추출하지 못했습니다."}), 400
+
+    def gen():
+        if upload.entry:
+            yield sse("done", cached_payload(upload.entry))
+            return
+
+        # Deltas are produced on the event loop thread and handed over through a queue
+        deltas: "queue.Queue[Optional[str]]" = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(call_openai_generate(upload.chunks, deltas.put), _LOOP)
+        future.add_done_callback(lambda _: deltas.put(None))
+        try:
+            while (delta := deltas.get()) is not None:
+                yield sse("delta", {"delta": delta})
+            yield sse("done", save_result(future.result(), upload.digest, cache=upload.complete))
+        except Exception as e:
+            yield sse("error", {"ok": False, "error": str(e)})
+        finally:
+            # Client went away mid-stream: stop generating
+            future.cancel()
+
+    return Response(
+        stream_with_context(gen()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/list/problems")
 def list_problems():
-    files = sorted(PROBLEMS_DIR.glob("problems_*.json"), reverse=True)
-    return jsonify([{ "name": p.name, "url": url_for("serve_problem_file", filename=p.name) } for p in files])
+    names = [e["problems"] for e in index_tail() if e.get("problems")]
+    return jsonify([{ "name": name, "url": url_for("serve_problem_file", filename=name) } for name in names])
 
 
 @app.get("/api/list/summaries")
 def list_summaries():
-    files = sorted(SUMMARIES_DIR.glob("summary_*.md"), reverse=True)
-    return jsonify([{ "name": p.name, "url": url_for("serve_summary_file", filename=p.name) } for p in files])
+    names = [e["summary"] for e in index_tail() if e.get("summary")]
+    return jsonify([{
+        "name": name,
+        "url": url_for("serve_summary_file", filename=name),
+        "html_url": url_for("serve_summary_file", filename=Path(name).with_suffix(".html").name),
+    } for name in names])
+
+
+@app.post("/api/rebuild-index")
+def api_rebuild_index():
+    return jsonify({"ok": True, "entries": rebuild_index()})
 
 
 @app.get("/problems")
@@ -259,14 +1366,73 @@ def summaries_page():
     return render_template_string(SUMMARIES_HTML)
 
 
+@app.get("/problems/<digest>")
+def batch_page(digest):
+    return render_template_string(BATCH_HTML)
+
+
+@app.get("/api/batch/<digest>")
+def batch_status(digest):
+    entry = cache_lookup(cache_key(digest))
+    if entry:
+        summary_name = entry["summary"]
+        return jsonify({
+            "ok": True,
+            "status": "completed",
+            "problems_url": url_for("serve_problem_file", filename=entry["problems"]),
+            "summary_url": url_for("serve_summary_file", filename=summary_name),
+            "summary_html_url": url_for("serve_summary_file", filename=Path(summary_name).with_suffix(".html").name),
+        })
+    batch = get_batch(digest)
+    if batch is None:
+        return jsonify({"ok": False, "error": "해당 배치 작업을 찾을 수 없습니다."}), 404
+    if batch["status"] == "completed":
+        # No cache hit above, so the saved files are gone; re-uploading resubmits the batch
+        return jsonify({"ok": True, "status": "failed", "error": "생성된 결과 파일을 찾을 수 없습니다."})
+    return jsonify({"ok": True, "status": batch["status"], "error": batch["error"]})
+
+
+def send_result_file(directory: Path, filename: str, mimetype: Optional[str] = None) -> Response:
+    """Serve a saved result as immutable with a content-hash ETag (revisits get 304)."""
+    path = safe_join(str(directory), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    st = os.stat(path)
+    resp = send_from_directory(
+        directory, filename, as_attachment=False, mimetype=mimetype,
+        max_age=RESULT_MAX_AGE_S, etag=file_etag(path, st.st_mtime_ns, st.st_size),
+    )
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    return resp
+
+
 @app.get("/data/problems/<path:filename>")
 def serve_problem_file(filename):
-    return send_from_directory(PROBLEMS_DIR, filename, as_attachment=False)
+    if not filename.endswith(".json"):
+        return send_result_file(PROBLEMS_DIR, filename)
+    # Offer the precompressed copies written at save time (older results may not have them);
+    # best_match honours q-values, so "gzip;q=0" is never sent gzip
+    suffixes = {"br": ".br", "gzip": ".gz"}
+    offers = [enc for enc, suffix in suffixes.items() if (PROBLEMS_DIR / (filename + suffix)).is_file()]
+    encoding = request.accept_encodings.best_match(offers + ["identity"], default="identity")
+    if encoding in suffixes:
+        resp = send_result_file(PROBLEMS_DIR, filename + suffixes[encoding], mimetype="application/json")
+        resp.headers["Content-Encoding"] = encoding
+    else:
+        resp = send_result_file(PROBLEMS_DIR, filename, mimetype="application/json")
+    resp.vary.add("Accept-Encoding")
+    return resp
 
 
 @app.get("/data/summaries/<path:filename>")
 def serve_summary_file(filename):
-    return send_from_directory(SUMMARIES_DIR, filename, as_attachment=False)
+    # Rendered HTML is written at save time; summaries saved before that are rendered on first view
+    if filename.endswith(".html"):
+        md_path = SUMMARIES_DIR / Path(filename).with_suffix(".md").name
+        if md_path.exists() and not md_path.with_suffix(".html").exists():
+            write_summary_html(md_path)
+    return send_result_file(SUMMARIES_DIR, filename)
 
 
 # ---------------------------
@@ -308,6 +1474,7 @@ INDEX_HTML = r"""
       <form id="uploadForm" class="flex flex-col md:flex-row items-start md:items-center gap-4">
         <input type="file" id="pdf" name="pdf" accept="application/pdf" class="block" required />
         <button type="submit" class="px-4 py-2 rounded-xl bg-black text-white hover:bg-gray-800">PDF 업로드 & 생성</button>
+        <button type="submit" value="batch" class="px-4 py-2 rounded-xl border border-gray-300 hover:bg-gray-100" title="OpenAI Batch API로 약 50% 저렴하게 생성 (수 분~수 시간 소요)">저렴하게 생성 (느림)</button>
         <span id="status" class="text-sm text-gray-500"></span>
       </form>
       <p class="text-xs text-gray-500 mt-2">⚠️ 최초 실행 시 OPENAI_API_KEY 환경변수를 설정해야 합니다.</p>
@@ -339,7 +1506,8 @@ INDEX_HTML = r"""
   </div>
 
 <script>
-let CURRENT = { problems: {basic: [], advanced: []}, activeTab: 'basic', summary_url: null };
+const EMPTY_LEVEL = { questions: [], choices: [], answer_index: [], explanation: [] };
+let CURRENT = { problems: {basic: EMPTY_LEVEL, advanced: EMPTY_LEVEL}, activeTab: 'basic', summary_url: null };
 
 function renderChoices(qIdx, choices, answerIndex) {
   const groupName = `q_${qIdx}_${CURRENT.activeTab}`;
@@ -353,19 +1521,19 @@ function renderChoices(qIdx, choices, answerIndex) {
 
 function renderQuiz() {
   const container = document.getElementById('quizContainer');
-  const list = CURRENT.problems[CURRENT.activeTab] || [];
-  if (!list.length) {
+  const cols = CURRENT.problems[CURRENT.activeTab] || EMPTY_LEVEL;
+  if (!cols.questions.length) {
     container.innerHTML = `<p class="text-gray-500 text-sm">아직 생성된 문제가 없습니다. PDF를 업로드하세요.</p>`;
     return;
   }
 
-  container.innerHTML = list.map((q, idx) => `
+  container.innerHTML = cols.questions.map((question, idx) => `
     <div class="border rounded-2xl p-4">
       <div class="flex items-start gap-3">
         <div class="shrink-0 w-6 h-6 rounded-full bg-gray-900 text-white grid place-items-center text-xs">${idx+1}</div>
         <div class="grow">
-          <p class="font-medium mb-2">${q.question}</p>
-          <div class="space-y-2">${renderChoices(idx, q.choices, q.answer_index)}</div>
+          <p class="font-medium mb-2">${question}</p>
+          <div class="space-y-2">${renderChoices(idx, cols.choices[idx], cols.answer_index[idx])}</div>
           <p id="ex_${idx}" class="mt-3 text-sm hidden"></p>
         </div>
       </div>
@@ -385,8 +1553,8 @@ window.onPick = (qIdx, picked, answerIdx) => {
   const correct = (picked === answerIdx);
   target.classList.add(correct ? 'correct' : 'wrong');
   exp.classList.remove('hidden');
-  const item = CURRENT.problems[CURRENT.activeTab][qIdx];
-  exp.textContent = (correct ? '✅ 정답입니다. ' : '❌ 오답입니다. ') + (item.explanation || '');
+  const explanation = CURRENT.problems[CURRENT.activeTab].explanation[qIdx];
+  exp.textContent = (correct ? '✅ 정답입니다. ' : '❌ 오답입니다. ') + (explanation || '');
 };
 
 function setActiveTab(tab) {
@@ -402,25 +1570,97 @@ document.getElementById('tabAdvanced').addEventListener('click', () => setActive
 // Upload handler
 const form = document.getElementById('uploadForm');
 const statusEl = document.getElementById('status');
+
+function showResult(j) {
+  CURRENT.problems = j.problems || {basic: EMPTY_LEVEL, advanced: EMPTY_LEVEL};
+  const summaryEl = document.getElementById('summary');
+  summaryEl.classList.remove('whitespace-pre-wrap');
+  summaryEl.innerHTML = j.summary_html || '';
+  if (j.summary_url) {
+    CURRENT.summary_url = j.summary_url;
+    const btn = document.getElementById('openSummaryRaw');
+    btn.classList.remove('hidden');
+    btn.onclick = () => window.open(j.summary_url, '_blank');
+  }
+  setActiveTab('basic');
+}
+
+// Reads a text/event-stream response body and calls onEvent(name, data) per event.
+// (EventSource cannot POST a file, so the stream is parsed from fetch instead.)
+async function readEvents(res, onEvent) {
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buf = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buf += value;
+    let sep;
+    while ((sep = buf.indexOf('\n\n')) >= 0) {
+      const frame = buf.slice(0, sep);
+      buf = buf.slice(sep + 2);
+      let name = 'message', data = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) name = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      onEvent(name, JSON.parse(data));
+    }
+  }
+}
+
+async function submitBatch(fd) {
+  statusEl.textContent = '배치 작업 등록 중...';
+  const res = await fetch('/api/process?mode=batch', { method: 'POST', body: fd });
+  const j = await res.json();
+  if (!j.ok) throw new Error(j.error || '생성 실패');
+  if (j.status_url) {
+    statusEl.innerHTML = `배치로 등록했습니다. 약 5~30분 후 <a class="text-blue-600 underline" href="${j.status_url}" target="_blank">${j.status_url}</a> 에서 확인하세요 (북마크 권장).`;
+  } else {
+    showResult(j);  // already generated before: served from cache
+    statusEl.textContent = '완료! (이전에 생성된 결과)';
+  }
+}
+
 form.addEventListener('submit', async (e) => {
   e.preventDefault();
-  statusEl.textContent = '생성 중... (PDF 크기에 따라 수십 초 소요 가능)';
   const fd = new FormData(form);
+  if (e.submitter && e.submitter.value === 'batch') {
+    try {
+      await submitBatch(fd);
+    } catch (err) {
+      console.error(err);
+      statusEl.textContent = '오류: ' + err.message;
+    }
+    return;
+  }
+  statusEl.textContent = '생성 중... (PDF 크기에 따라 수십 초 소요 가능)';
+  const summaryEl = document.getElementById('summary');
+  let draft = '';
   try {
-    const res = await fetch('/api/process', { method: 'POST', body: fd });
-    const j = await res.json();
-    if (!j.ok) throw new Error(j.error || '생성 실패');
-
-    CURRENT.problems = j.problems || {basic: [], advanced: []};
-    document.getElementById('summary').innerHTML = j.summary_html || '';
-    if (j.summary_url) {
-      CURRENT.summary_url = j.summary_url;
-      const btn = document.getElementById('openSummaryRaw');
-      btn.classList.remove('hidden');
-      btn.onclick = () => window.open(j.summary_url, '_blank');
+    const res = await fetch('/api/process/stream', { method: 'POST', body: fd });
+    if (!res.ok) {
+      const j = await res.json();
+      throw new Error(j.error || '생성 실패');
     }
-
-    setActiveTab('basic');
+    let result = null;
+    await readEvents(res, (name, data) => {
+      if (name === 'delta') {
+        // Show the raw Markdown as it streams in; replaced by rendered HTML when done
+        if (!draft) {
+          summaryEl.classList.add('whitespace-pre-wrap');
+          statusEl.textContent = '요약 작성 중... 문제는 요약이 끝나면 함께 표시됩니다.';
+        }
+        draft += data.delta;
+        summaryEl.textContent = draft;
+      } else if (name === 'done') {
+        result = data;
+      } else if (name === 'error') {
+        throw new Error(data.error || '생성 실패');
+      }
+    });
+    if (!result) throw new Error('응답이 중간에 끊어졌습니다.');
+
+    showResult(result);
     statusEl.textContent = '완료! 좌/우에서 바로 확인하세요.';
   } catch (err) {
     console.error(err);
@@ -491,7 +1731,10 @@ SUMMARIES_HTML = r"""
     return;
   }
   list.innerHTML = items.map(it => `
-    <a class="block bg-white rounded-xl border p-3 hover:bg-gray-50" href="${it.url}" target="_blank">${it.name}</a>
+    <div class="flex items-center gap-3 bg-white rounded-xl border p-3 hover:bg-gray-50">
+      <a class="grow" href="${it.url}" target="_blank">${it.name}</a>
+      <a class="text-sm text-blue-600 hover:underline" href="${it.html_url}" target="_blank">HTML 보기</a>
+    </div>
   `).join('');
 })();
 </script>
@@ -499,6 +1742,54 @@ SUMMARIES_HTML = r"""
 </html>
 """
 
+BATCH_HTML = r"""
+<!doctype html>
+<html lang="ko">
+<head>
+  <meta charset="utf-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  <title>배치 생성 결과</title>
+  <script src="https://cdn.tailwindcss.com"></script>
+</head>
+<body class="bg-gray-50 text-gray-900">
+  <div class="max-w-4xl mx-auto p-6">
+    <h1 class="text-2xl font-bold mb-4">배치 생성 결과</h1>
+    <div id="result" class="bg-white rounded-xl border p-4 space-y-2"></div>
+    <p class="mt-6"><a class="text-blue-600 hover:underline" href="/">← 돌아가기</a></p>
+  </div>
+<script>
+const digest = location.pathname.split('/').pop();
+const STATUS_TEXT = {
+  submitted: '⏳ 생성 대기 중입니다. 보통 5~30분 정도 걸립니다. (이 페이지는 자동으로 새로고침됩니다)',
+  collecting: '⏳ 결과를 정리하는 중입니다...',
+  failed: '❌ 생성에 실패했습니다. PDF를 다시 업로드해 주세요.',
+};
+async function refresh() {
+  const res = await fetch(`/api/batch/${digest}`);
+  const j = await res.json();
+  const el = document.getElementById('result');
+  if (!j.ok) {
+    el.textContent = j.error;
+    return;
+  }
+  if (j.status === 'completed') {
+    el.innerHTML = `
+      <p>✅ 생성이 완료되었습니다.</p>
+      <a class="block text-blue-600 hover:underline" href="${j.problems_url}" target="_blank">문제 (JSON)</a>
+      <a class="block text-blue-600 hover:underline" href="${j.summary_html_url}" target="_blank">요약 (HTML)</a>
+      <a class="block text-blue-600 hover:underline" href="${j.summary_url}" target="_blank">요약 (Markdown)</a>
+    `;
+    return;
+  }
+  el.textContent = STATUS_TEXT[j.status] + (j.error ? ` (${j.error})` : '');
+  if (j.status !== 'failed') setTimeout(refresh, 30000);
+}
+refresh();
+</script>
+</body>
+</html>
+"""
+
 
 # ---------------------------
 # Main
@@ -510,8 +1801,12 @@ if __name__ == "__main__":
         req.write_text("""
 Flask>=3.0.0
 pypdf>=4.2.0
-markdown>=3.6
+pypdfium2>=4.0.0
+mistune>=3.0.0
 openai>=1.40.0
+httpx>=0.27.0
+tiktoken>=0.7.0
+orjson>=3.9.0
 python-dotenv>=1.0.1
 """.strip()+"\n", encoding="utf-8")
         print("[INFO] requirements.txt 를 생성했습니다.")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+PDF content-stream filter used by app.py's pypdf backend.
+
+Kept free of app.py's start-up work (OpenAI client, event loop, extractor pool,
+tokenizer download) so it can be imported on its own, e.g. by tests/.
+"""
+import re
+from typing import List
+
+# Content-stream operators that only paint graphics (paths, colors, line styles, shadings,
+# marked content, inline images). Text extraction never looks at them, but on diagram-heavy
+# pages they are nearly the whole stream. cm/q/Q/gs/Do are kept: they move the text
+# matrix or pull in form XObjects that can contain text.
+GFX_OPS = frozenset({
+    b"m", b"l", b"c", b"v", b"y", b"h", b"re",
+    b"f", b"f*", b"F", b"S", b"s", b"B", b"B*", b"b", b"b*", b"n", b"W", b"W*",
+    b"rg", b"RG", b"cs", b"CS", b"sc", b"SC", b"scn", b"SCN", b"g", b"G", b"k", b"K",
+    b"w", b"J", b"j", b"M", b"d", b"ri", b"i", b"sh",
+    b"MP", b"DP", b"BMC", b"BDC", b"EMC", b"d0", b"d1",
+})
+
+_PDF_WS = b"\x00\t\n\f\r "
+_REGULAR_RE = re.compile(rb"[^\x00\t\n\f\r ()<>\[\]{}/%]+")
+_NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_INLINE_IMAGE_END_RE = re.compile(rb"[\x00\t\n\f\r ]EI(?=[\x00\t\n\f\r ]|$)")
+
+
+def _skip_literal_string(data: bytes, pos: int) -> int:
+    """Return the index just past the literal string starting at data[pos] == '('."""
+    depth = 0
+    n = len(data)
+    while pos < n:
+        ch = data[pos]
+        if ch == 0x5C:  # backslash escapes the next byte
+            pos += 2
+            continue
+        if ch == 0x28:
+            depth += 1
+        elif ch == 0x29:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    return n
+
+
+def filter_text_operators(data: bytes) -> bytes:
+    """Drop graphics-only operator groups (operands + operator) from a content stream."""
+    out: List[bytes] = []
+    n = len(data)
+    pos = 0
+    group_start = 0
+    while pos < n:
+        ch = data[pos]
+        if ch in _PDF_WS:
+            pos += 1
+        elif ch == 0x25:  # % comment
+            eol = data.find(b"\n", pos)
+            pos = n if eol < 0 else eol + 1
+        elif ch == 0x28:  # (literal string)
+            pos = _skip_literal_string(data, pos)
+        elif data.startswith(b"<<", pos) or data.startswith(b">>", pos):
+            pos += 2
+        elif ch == 0x3C:  # <hex string>
+            end = data.find(b">", pos)
+            pos = n if end < 0 else end + 1
+        elif ch in b"[]{}>)":
+            pos += 1
+        elif ch == 0x2F:  # /Name
+            m = _REGULAR_RE.match(data, pos + 1)
+            pos = m.end() if m else pos + 1
+        else:
+            m = _REGULAR_RE.match(data, pos)
+            token = m.group(0)
+            pos = m.end()
+            if _NUMBER_RE.fullmatch(token) or token in (b"true", b"false", b"null"):
+                continue  # operand
+            if token == b"BI":
+                # Inline image: dictionary, ID, then raw binary data up to EI
+                data_start = data.find(b"ID", pos)
+                end = _INLINE_IMAGE_END_RE.search(data, data_start + 3) if data_start >= 0 else None
+                pos = end.end() if end else n
+            elif token not in GFX_OPS:
+                out.append(data[group_start:pos])
+            group_start = pos
+    return b"\n".join(out)
@@ -1,6 +1,6 @@
 import { useState } from 'react';
 import { CheckCircle2, XCircle } from 'lucide-react';
-import { Problems, QuizTab, QuizQuestion } from '../types';
+import { Problems, QuizTab, QuizQuestion, QuizColumns } from '../types';
 
 interface QuizSectionProps {
   problems: Problems;
@@ -116,8 +116,18 @@ function QuizItem({ question, index }: QuizItemProps) {
   );
 }
 
+function questionAt(columns: QuizColumns, index: number): QuizQuestion {
+  return {
+    question: columns.questions[index],
+    choices: columns.choices[index],
+    answer_index: columns.answer_index[index],
+    explanation: columns.explanation[index],
+  };
+}
+
 function QuizSection({ problems, activeTab, onTabChange }: QuizSectionProps) {
-  const currentProblems = problems[activeTab] || [];
+  const currentProblems = problems[activeTab];
+  const questions = currentProblems?.questions ?? [];
 
   return (
     <div className="bg-gradient-to-br from-gray-900/90 to-gray-800/90 backdrop-blur-sm rounded-3xl shadow-2xl border border-gray-700/50 p-6 md:p-8">
@@ -151,13 +161,13 @@ function QuizSection({ problems, activeTab, onTabChange }: QuizSectionProps) {
       </div>
 
       <div className="space-y-4 max-h-[800px] overflow-y-auto pr-2 custom-scrollbar">
-        {currentProblems.length === 0 ? (
+        {questions.length === 0 ? (
           <div className="text-center py-12">
             <p className="text-gray-400">PDF를 업로드하여 문제를 생성하세요.</p>
           </div>
         ) : (
-          currentProblems.map((question, index) => (
-            <QuizItem key={index} question={question} index={index} />
+          questions.map((_, index) => (
+            <QuizItem key={index} question={questionAt(currentProblems, index)} index={index} />
           ))
         )}
       </div>
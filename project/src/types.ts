@@ -7,9 +7,17 @@ export interface QuizQuestion {
   explanation: string;
 }
 
+// Columnar (SoA) layout sent by /api/process: index i across all columns is one question
+export interface QuizColumns {
+  questions: string[];
+  choices: string[][];
+  answer_index: number[];
+  explanation: string[];
+}
+
 export interface Problems {
-  basic: QuizQuestion[];
-  advanced: QuizQuestion[];
+  basic: QuizColumns;
+  advanced: QuizColumns;
 }
 
 export interface ProcessedData {
@@ -0,0 +1,46 @@
+"""Tests for the content-stream lexer that strips graphics operators before pypdf extraction."""
+from pdf_filter import filter_text_operators
+
+
+def tokens(data: bytes):
+    # Compare token sequences; the filter is free to re-join kept groups with any whitespace
+    return filter_text_operators(data).split()
+
+
+def test_literal_strings_with_escaped_and_nested_parentheses():
+    data = (
+        b"BT /F1 12 Tf 72 700 Td "
+        b"(a \\) b (nested (deep \\( x)) 0 0 m re) Tj "
+        b"ET 0 0 10 10 re f"
+    )
+    # Operators inside the string stay part of its Tj group; the trailing path is dropped
+    assert tokens(data) == (
+        b"BT /F1 12 Tf 72 700 Td (a \\) b (nested (deep \\( x)) 0 0 m re) Tj ET".split()
+    )
+
+
+def test_hex_strings_versus_dictionaries():
+    data = b"/Span <</ActualText (x>Tj) /MCID 0 /Alt <3E3E> >> BDC BT <48656C6C6F> Tj ET EMC"
+    # The marked-content dictionary (with a hex string inside) goes with BDC; the text hex string stays
+    assert tokens(data) == [b"BT", b"<48656C6C6F>", b"Tj", b"ET"]
+
+
+def test_operators_glued_to_operands():
+    data = b"0 0 1 1 re f(y)Tj[(a)-20(b)]TJ/F1 9 Tf"
+    assert tokens(data) == [b"(y)Tj", b"[(a)-20(b)]TJ", b"/F1", b"9", b"Tf"]
+
+
+def test_inline_image_data_is_skipped():
+    # Binary data may contain "EI" not delimited by whitespace, and bytes that look like delimiters
+    data = b"q BI /W 2 /H 2 /CS /G /BPC 8 ID \x01EI\x02 (\xff<\x00 EI Q BT (t) Tj ET"
+    assert tokens(data) == [b"q", b"Q", b"BT", b"(t)", b"Tj", b"ET"]
+
+
+def test_graphics_only_stream_becomes_empty():
+    data = b"1 0 0 RG 0 0 m 100 100 l S 0.5 g 0 0 50 50 re f\n% comment (x) Tj\n2 w [3 1] 0 d"
+    assert filter_text_operators(data) == b""
+
+
+def test_text_only_stream_keeps_every_operator():
+    data = b"q 1 0 0 1 50 50 cm BT /F1 10 Tf 0 -12 TD (line one) Tj T* (line two) ' ET /Fm0 Do Q"
+    assert tokens(data) == data.split()